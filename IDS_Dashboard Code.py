@@ -1,37 +1,81 @@
 # --- Standard Library ---
 import os, json, joblib        # For file/directory handling, file/directory handling, saving/loading trained ML models efficiently
+import io, hashlib, re         # In-memory file buffers, hashing datasets for cache keys, label matching
+import functools               # Bind arguments for deferred download encoding
 
 # --- Data Handling & Math ---
 import numpy as np             # Numerical computations, arrays, matrix operations
 import pandas as pd            # Data loading and manipulation (CSV, DataFrame)
+import pyarrow as pa           # Arrow tables for fast columnar export
+import pyarrow.csv as pa_csv   # Multi-threaded C++ CSV writer
 
 # --- Dashboard & Visualization ---
 import streamlit as st                  # Build interactive web dashboard
 import plotly.express as px             # Interactive plots (pie, scatter, etc.) 
 import matplotlib.pyplot as plt         # Static plots (confusion matrix, ROC, histograms)
 
+# --- Optional: Intel Extension for scikit-learn (must patch before sklearn imports) ---
+try:
+    from sklearnex import patch_sklearn         # Route supported estimators to oneDAL SIMD kernels
+    patch_sklearn()
+except ImportError:
+    pass
+
 # --- Machine Learning (scikit-learn) ---
 from sklearn.model_selection import train_test_split                   # Split dataset into train/test
-from sklearn.preprocessing import StandardScaler                       # Normalize/scale numeric features
 from sklearn.ensemble import IsolationForest, RandomForestClassifier   # ML models
 from sklearn.metrics import classification_report, roc_auc_score, confusion_matrix, RocCurveDisplay
 
+# --- Optional: HummingBird compiles tree ensembles into PyTorch tensor ops (IDS_RF_BACKEND=hummingbird) ---
+try:
+    import torch                                # Tensor runtime (CPU or CUDA)
+    from hummingbird.ml import convert as hb_convert
+except ImportError:
+    torch = hb_convert = None
+
+# --- Optional: ONNX Runtime for RandomForest scoring (IDS_RF_BACKEND=onnx) ---
+try:
+    from skl2onnx import to_onnx                # Convert fitted sklearn models to ONNX
+    import onnxruntime as ort                   # Run ONNX models with fused C++ tree kernels
+except ImportError:
+    to_onnx = ort = None
+
 # ----------------------------
 # Streamlit page configuration
 # ----------------------------
 st.set_page_config(page_title="CICIDS IDS Dashboard", layout="wide")
 
+# --- Label shown for rows whose "Label" cell is empty ---
+MISSING_LABEL = "(missing)"
+
 # --- Keywords for detecting DoS/DDoS attacks in CICIDS ---
 ATTACK_KEYWORDS = ["ddos", "dos", "hulk", "goldeneye", "slowloris", "slowhttptest"]
+_ATTACK_RE = re.compile("|".join(map(re.escape, ATTACK_KEYWORDS)))
+
+# --- Max benign rows used to fit IsolationForest (each tree only samples 256) ---
+IFOREST_MAX_BENIGN = 50_000
+
+# --- RandomForest scoring backend: "sklearn" (default), "onnx" or "hummingbird" ---
+RF_BACKENDS = ("sklearn", "onnx", "hummingbird")
+RF_BACKEND = os.environ.get("IDS_RF_BACKEND", "sklearn").lower()
+
+# --- Rows per chunk when streaming uploaded CSVs ---
+CSV_CHUNKSIZE = 200_000
+
+# --- Max points drawn in ROC curves (AUC is still computed on all points) ---
+ROC_MAX_POINTS = 50_000
+
+# --- Rows per page in the interactive predictions table ---
+TABLE_PAGE_SIZE = 100
 
 # ----------------------------------------------------------
 # Helper: Convert dataset "Label" into binary {0=Benign, 1=Attack}
 # ----------------------------------------------------------
-def infer_binary_label(label: str) -> int:
-    s = str(label).lower()
-    if s == "benign":
-        return 0
-    return int(any(k in s for k in ATTACK_KEYWORDS))
+def infer_binary_labels(labels: pd.Series) -> np.ndarray:
+    # Vectorized over the whole column (no per-row Python calls)
+    s = labels.astype(str).str.lower()
+    is_attack = s.str.contains(_ATTACK_RE, regex=True, na=False) & ~s.eq("benign")
+    return is_attack.to_numpy(dtype=np.int8)
 
 # ----------------------------------------------------------
 # Helper: Plot Confusion Matrix (Benign vs Attack)
@@ -50,6 +94,22 @@ def plot_confusion_matrix(y_true, y_pred):
     fig.tight_layout()
     return fig
 
+# ----------------------------------------------------------
+# Helper: Class-balanced subsample for drawing ROC curves
+# (up to max_points/2 rows from each class)
+# ----------------------------------------------------------
+def subsample_for_roc(y_true, scores, max_points=ROC_MAX_POINTS, seed=0):
+    if len(scores) <= max_points:
+        return y_true, scores
+    rng = np.random.default_rng(seed)
+    pos, neg = np.flatnonzero(y_true == 1), np.flatnonzero(y_true == 0)
+    k = max_points // 2
+    sel = np.concatenate([
+        rng.choice(pos, min(len(pos), k), replace=False),
+        rng.choice(neg, min(len(neg), k), replace=False)
+    ])
+    return y_true[sel], scores[sel]
+
 # ----------------------------------------------------------
 # Helper: Plot ROC Curve and calculate AUC score
 # ----------------------------------------------------------
@@ -58,8 +118,10 @@ def plot_roc(y_true, scores, label_name):
         auc = roc_auc_score(y_true, scores)
     except Exception:
         auc = float('nan')
+    # AUC above uses all points; the drawn curve uses a class-balanced subsample
+    y_plot, s_plot = subsample_for_roc(np.asarray(y_true), np.asarray(scores))
     fig, ax = plt.subplots(figsize=(4,4))
-    RocCurveDisplay.from_predictions(y_true, scores, ax=ax, name=f"{label_name} AUC={auc:.3f}")
+    RocCurveDisplay.from_predictions(y_plot, s_plot, ax=ax, name=f"{label_name} AUC={auc:.3f}")
     ax.set_title(f'ROC Curve — {label_name}')
     fig.tight_layout()
     return fig, auc
@@ -68,104 +130,255 @@ def plot_roc(y_true, scores, label_name):
 # Helper: Plot histogram of anomaly scores (for IsolationForest)
 # ----------------------------------------------------------
 def plot_hist(scores):
+    # Bucket counts are precomputed; matplotlib only draws the bars
+    counts, edges = np.histogram(scores, bins=40)
     fig, ax = plt.subplots(figsize=(5,3))
-    ax.hist(scores, bins=40, color="purple", alpha=0.7)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge", color="purple", alpha=0.7)
     ax.set_title('Anomaly Score Histogram')
     ax.set_xlabel('Score (higher=worse)')
     ax.set_ylabel('Count')
     fig.tight_layout()
     return fig
 
+# ----------------------------------------------------------
+# Helper: Per-column mean/std accumulated over row chunks
+# ----------------------------------------------------------
+def column_mean_std(X, chunk_rows=100_000):
+    # Sums of (x - shift) in float64 per chunk: temporaries stay O(chunk) instead of
+    # a full-size (X - mean) copy, and the shift keeps large-valued columns accurate
+    shift = X[0].astype(np.float64)
+    s1 = np.zeros(X.shape[1]); s2 = np.zeros(X.shape[1])
+    for start in range(0, len(X), chunk_rows):
+        d = X[start:start + chunk_rows].astype(np.float64) - shift
+        s1 += d.sum(axis=0)
+        s2 += np.square(d).sum(axis=0)
+    m1 = s1 / len(X)
+    var = np.maximum(s2 / len(X) - m1 ** 2, 0)
+    return (shift + m1).astype(np.float32), np.sqrt(var).astype(np.float32)
+
+# ----------------------------------------------------------
+# Helper: Render a figure to PNG bytes once, so reruns only resend the image
+# ----------------------------------------------------------
+def fig_to_png(fig, dpi=200):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+# ----------------------------------------------------------
+# Helper: RandomForest attack probabilities (sklearn unless another backend is chosen)
+# ----------------------------------------------------------
+def rf_attack_proba(rf, X):
+    # Converting the forest costs more than one sklearn pass over the test set,
+    # so compiled backends are opt-in; any conversion error falls back to sklearn
+    if RF_BACKEND not in RF_BACKENDS:
+        st.warning(f"Unknown IDS_RF_BACKEND '{RF_BACKEND}' (expected one of {', '.join(RF_BACKENDS)}); "
+                   "scoring RandomForest with sklearn.")
+    if RF_BACKEND == "hummingbird":
+        if hb_convert is None:
+            st.warning("IDS_RF_BACKEND=hummingbird but hummingbird-ml/torch are not installed; "
+                       "scoring RandomForest with sklearn.")
+        else:
+            try:
+                model = hb_convert(rf, "pytorch")
+                if torch.cuda.is_available():
+                    model.to("cuda")
+                return model.predict_proba(X.astype(np.float32, copy=False))[:, 1]
+            except Exception as exc:
+                st.warning(f"HummingBird scoring failed ({exc}); scoring RandomForest with sklearn.")
+    if RF_BACKEND == "onnx":
+        if to_onnx is None:
+            st.warning("IDS_RF_BACKEND=onnx but skl2onnx/onnxruntime are not installed; "
+                       "scoring RandomForest with sklearn.")
+        else:
+            try:
+                X32 = X.astype(np.float32, copy=False)
+                onx = to_onnx(rf, X32[:1], target_opset={"": 17, "ai.onnx.ml": 3},
+                              options={id(rf): {"zipmap": False}})
+                sess = ort.InferenceSession(onx.SerializeToString(), providers=["CPUExecutionProvider"])
+                return sess.run(None, {"X": X32})[1][:, 1]
+            except Exception as exc:
+                st.warning(f"ONNX Runtime scoring failed ({exc}); scoring RandomForest with sklearn.")
+    with joblib.parallel_backend("threading", n_jobs=-1):
+        return rf.predict_proba(X)[:, 1]
+
 # ----------------------------------------------------------
 # Train and evaluate both IsolationForest & RandomForest
 # ----------------------------------------------------------
-def train_and_evaluate(df, test_size=0.2, random_state=42):
-    # Ensures dataset has labels
-    if "Label" not in df.columns:
+def train_and_evaluate(data, random_state=42):
+    # Run every fit/predict on threads: sklearn's tree kernels release the GIL,
+    # and threads share the training arrays instead of copying them per process
+    with joblib.parallel_backend("threading", n_jobs=-1):
+        X, y = data["X"], data["y"]
+        idx_tr, idx_te = data["idx_tr"], data["idx_te"]
+        y_train, y_test = y[idx_tr], y[idx_te]
+        raw_test = data["raw_test"]  # original rows for later analysis
+
+        # Standardize features (mean=0, std=1) directly on contiguous float32 arrays
+        X_train_s, X_test_s = X[idx_tr], X[idx_te]   # fancy indexing → fresh arrays
+        mu, sd = column_mean_std(X_train_s)
+        sd[sd == 0] = 1     # constant columns: leave centred values as-is
+        for arr in (X_train_s, X_test_s):
+            arr -= mu
+            arr /= sd
+
+        results = {"scaling": {"mean": mu, "std": sd}}
+
+        # =======================================================
+        # Model 1: IsolationForest (unsupervised anomaly detection)
+        # =======================================================
+        benign_mask = (y_train == 0)  # train only on benign data
+        iforest = IsolationForest(
+            n_estimators=300,
+            max_samples='auto',
+            contamination='auto',
+            random_state=random_state,
+            n_jobs=None     # worker count comes from the enclosing parallel_backend
+        )
+        # Train only on a bounded random subsample of benign rows
+        rng = np.random.default_rng(random_state)
+        benign_idx = np.flatnonzero(benign_mask)
+        pick = rng.choice(benign_idx, size=min(len(benign_idx), IFOREST_MAX_BENIGN), replace=False)
+        iforest.fit(X_train_s[pick])
+        decision = iforest.decision_function(X_test_s)   # anomaly scores (higher = normal)
+        anomaly_score = (-decision).astype(np.float32)     # flip so higher = worse
+        # Same as iforest.predict(X_test_s) == -1 (predict thresholds decision_function at 0),
+        # without a second traversal of all trees
+        pred_iso = (decision < 0).astype(np.int8)
+
+        # Metrics
+        report_iso = classification_report(y_test, pred_iso, target_names=["Benign","Attack"], output_dict=True, zero_division=0)
+        roc_auc_iso = roc_auc_score(y_test, anomaly_score)
+
+        # Collect results in DataFrame
+        iso_df = raw_test.assign(y_true=y_test, anomaly_score=anomaly_score, y_pred=pred_iso)
+
+        results["iso"] = {
+            "report": report_iso,
+            "roc_auc": roc_auc_iso,
+            "df": iso_df,
+            "cm": fig_to_png(plot_confusion_matrix(y_test, pred_iso)),
+            "roc": fig_to_png(plot_roc(y_test, anomaly_score, "IsolationForest")[0]),
+            "hist": fig_to_png(plot_hist(anomaly_score))
+        }
+
+        # =======================================================
+        # Model 2: RandomForest (supervised classification)
+        # =======================================================
+        # Depth/leaf caps keep trees small, which bounds memory and prediction time
+        rf = RandomForestClassifier(
+            n_estimators=300,
+            max_depth=20,
+            min_samples_leaf=5,
+            max_features="sqrt",
+            random_state=random_state,
+            n_jobs=None     # worker count comes from the enclosing parallel_backend
+        )
+        rf.fit(X_train_s, y_train)
+        proba_rf = rf_attack_proba(rf, X_test_s).astype(np.float32, copy=False)  # probability of being attack
+        pred_rf = (proba_rf >= 0.5).astype(np.int8)  # threshold 0.5
+
+        # Metrics
+        report_rf = classification_report(y_test, pred_rf, target_names=["Benign","Attack"], output_dict=True, zero_division=0)
+        roc_auc_rf = roc_auc_score(y_test, proba_rf)
+
+        # Collect results
+        rf_df = raw_test.assign(y_true=y_test, attack_probability=proba_rf, y_pred=pred_rf)
+
+        results["rf"] = {
+            "report": report_rf,
+            "roc_auc": roc_auc_rf,
+            "df": rf_df,
+            "cm": fig_to_png(plot_confusion_matrix(y_test, pred_rf)),
+            "roc": fig_to_png(plot_roc(y_test, proba_rf, "RandomForest")[0]),
+            "hist": None
+        }
+
+        return results
+
+# ----------------------------------------------------------
+# Helper: Keep only rows whose original Label is in the selected filter
+# (not cached: a categorical-code mask is cheaper than unpickling a copy)
+# ----------------------------------------------------------
+def filter_view(df_view, label_filter):
+    if not label_filter:
+        return df_view
+    labels = df_view["Label"].cat
+    mask = labels.codes.isin(labels.categories.get_indexer(label_filter))
+    return df_view[mask]
+
+# ----------------------------------------------------------
+# Cached wrappers: Streamlit reruns the whole script on every
+# widget interaction, so parsing/training must not be redone
+# ----------------------------------------------------------
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_csv(data_hash, _file_bytes: bytes, test_size=0.2, random_state=42) -> dict:
+    # _file_bytes is not hashed by Streamlit; data_hash identifies the upload
+    # Infer the numeric schema from a small sample
+    sample = pd.read_csv(io.BytesIO(_file_bytes), nrows=1000)
+    if "Label" not in sample.columns:
         raise ValueError("CSV must contain a 'Label' column.")
-    
-    # Encode labels → binary
-    y = df["Label"].apply(infer_binary_label).astype(int)
-    # Use only numeric features for ML models
-    X = df.select_dtypes(include=[np.number]).copy()
-    if X.empty:
+    numeric_cols = sample.drop(columns=["Label"]).select_dtypes(include=[np.number]).columns.tolist()
+    if not numeric_cols:
         raise ValueError("No numeric feature columns found.")
 
-    # Train/test split (also keep original rows for later analysis)
-    X_train, X_test, y_train, y_test, raw_train, raw_test = train_test_split(
-        X, y, df, test_size=test_size, random_state=random_state, stratify=y
-    )
-    # Standardize features (mean=0, std=1)
-    scaler = StandardScaler()
-    scaler.fit(X_train)
-    X_train_s = scaler.transform(X_train)
-    X_test_s = scaler.transform(X_test)
-
-    results = {}
-
-    # =======================================================
-    # Model 1: IsolationForest (unsupervised anomaly detection)
-    # =======================================================
-    benign_mask = (y_train == 0)  # train only on benign data
-    iforest = IsolationForest(
-        n_estimators=300,
-        max_samples='auto',
-        contamination='auto',
-        random_state=random_state,
-        n_jobs=-1
+    # Pass 1: read only the labels, so the train/test split is known up front
+    # Few distinct labels over many rows: categorical codes make unique/isin cheap
+    labels = pd.read_csv(io.BytesIO(_file_bytes), usecols=["Label"], dtype={"Label": "category"})["Label"]
+    if labels.isna().any():
+        # Give missing labels their own category so the UI filter can select them
+        labels = labels.cat.add_categories([MISSING_LABEL]).fillna(MISSING_LABEL)
+    y = infer_binary_labels(labels)
+    # Train/test split on row indices, so no raw rows are duplicated
+    idx_tr, idx_te = train_test_split(
+        np.arange(len(y)), test_size=test_size, random_state=random_state, stratify=y
     )
-    iforest.fit(X_train_s[benign_mask])  # train only on benign samples
-    decision = iforest.decision_function(X_test_s)   # anomaly scores (higher = normal)
-    anomaly_score = (-decision)     # flip so higher = worse
-    pred_iso = (iforest.predict(X_test_s) == -1).astype(int)  # -1 → anomaly
-
-    # Metrics
-    report_iso = classification_report(y_test, pred_iso, target_names=["Benign","Attack"], output_dict=True, zero_division=0)
-    roc_auc_iso = roc_auc_score(y_test, anomaly_score)
-
-    # Collect results in DataFrame
-    iso_df = raw_test.copy()
-    iso_df["y_true"] = y_test.values
-    iso_df["anomaly_score"] = anomaly_score
-    iso_df["y_pred"] = pred_iso
-
-    results["iso"] = {
-        "report": report_iso,
-        "roc_auc": roc_auc_iso,
-        "df": iso_df,
-        "cm": plot_confusion_matrix(y_test, pred_iso),
-        "roc": plot_roc(y_test, anomaly_score, "IsolationForest")[0],
-        "hist": plot_hist(anomaly_score)
+    is_test = np.zeros(len(y), dtype=bool)
+    is_test[idx_te] = True
+
+    # Pass 2: stream the file in chunks, keeping a float32 feature matrix for all
+    # rows and the parsed (unmodified) rows for the test set only
+    parts_X, parts_raw = [], []
+    text_cols = set()   # looked numeric in the sample but hold text further down
+    for chunk in pd.read_csv(io.BytesIO(_file_bytes), chunksize=CSV_CHUNKSIZE, engine="c"):
+        feats = chunk[numeric_cols]
+        bad = [c for c in numeric_cols if not pd.api.types.is_numeric_dtype(feats[c])]
+        if bad:
+            text_cols.update(bad)
+            feats = feats.apply(pd.to_numeric, errors="coerce")
+        # Replace +/-inf and missing values with 0
+        parts_X.append(np.nan_to_num(feats.to_numpy(np.float32, copy=True), copy=False,
+                                     nan=0., posinf=0., neginf=0.))
+        parts_raw.append(chunk[is_test[chunk.index]])
+    raw_test = pd.concat(parts_raw).loc[idx_te]
+    raw_test["Label"] = labels.loc[idx_te]
+
+    X = np.vstack(parts_X)
+    if text_cols:
+        # Leave text columns out of the features, as a plain read_csv would
+        X = X[:, [i for i, c in enumerate(numeric_cols) if c not in text_cols]]
+        if X.shape[1] == 0:
+            raise ValueError("No numeric feature columns found.")
+    return {
+        "X": X,
+        "y": y,
+        "idx_tr": idx_tr,
+        "idx_te": idx_te,
+        "raw_test": raw_test,
     }
 
-    # =======================================================
-    # Model 2: RandomForest (supervised classification)
-    # =======================================================
-    rf = RandomForestClassifier(n_estimators=300, random_state=random_state, n_jobs=-1)
-    rf.fit(X_train_s, y_train)
-    proba_rf = rf.predict_proba(X_test_s)[:, 1]  # probability of being attack
-    pred_rf = (proba_rf >= 0.5).astype(int)      # threshold 0.5
-
-    # Metrics
-    report_rf = classification_report(y_test, pred_rf, target_names=["Benign","Attack"], output_dict=True, zero_division=0)
-    roc_auc_rf = roc_auc_score(y_test, proba_rf)
-
-    # Collect results
-    rf_df = raw_test.copy()
-    rf_df["y_true"] = y_test.values
-    rf_df["attack_probability"] = proba_rf
-    rf_df["y_pred"] = pred_rf
-
-    results["rf"] = {
-        "report": report_rf,
-        "roc_auc": roc_auc_rf,
-        "df": rf_df,
-        "cm": plot_confusion_matrix(y_test, pred_rf),
-        "roc": plot_roc(y_test, proba_rf, "RandomForest")[0],
-        "hist": None
-    }
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_results(data_hash, _data):
+    # _data is not hashed by Streamlit; data_hash identifies the dataset
+    return train_and_evaluate(_data)
 
-    return results
+@st.cache_data(show_spinner=False, max_entries=4)
+def to_csv_bytes(data_hash, model_key, label_filter, _df_view) -> bytes:
+    # Encoded once per (dataset, model, filter); only a few encodings are kept
+    tbl = pa.Table.from_pandas(_df_view, preserve_index=False)
+    buf = io.BytesIO()
+    pa_csv.write_csv(tbl, buf)
+    return buf.getvalue()
 
 # ----------------------------
 # Streamlit User Interface
@@ -177,11 +390,13 @@ st.caption("Train & compare IsolationForest (unsupervised) vs RandomForest (supe
 uploaded_file = st.file_uploader("Upload CICIDS2017 CSV file (cleaned)", type=["csv"])
 
 if uploaded_file:
-    df = pd.read_csv(uploaded_file)
+    file_bytes = uploaded_file.getvalue()
+    data_hash = hashlib.md5(file_bytes).hexdigest()
+    data = load_csv(data_hash, file_bytes)
 
-    # Train both models
+    # Train both models (cached per dataset)
     with st.spinner("Training models... this may take a while ⏳"):
-        results = train_and_evaluate(df)
+        results = get_results(data_hash, data)
     # Sidebar: choose which results to view
     mode = st.sidebar.radio(
         "Select Mode",
@@ -210,14 +425,14 @@ if uploaded_file:
         c1, c2, c3 = st.columns([1,1,1])
         with c1:
             st.subheader("Confusion Matrix")
-            st.pyplot(res["cm"])
+            st.image(res["cm"], width="stretch")
         with c2:
             st.subheader("ROC Curve")
-            st.pyplot(res["roc"])
+            st.image(res["roc"], width="stretch")
         with c3:
             if model_key == "iso" and res["hist"] is not None:
                 st.subheader("Anomaly Score Histogram")
-                st.pyplot(res["hist"])
+                st.image(res["hist"], width="stretch")
 
         st.markdown("---")
 
@@ -226,25 +441,36 @@ if uploaded_file:
         df_view = res["df"]
 
         # Optional filtering by original dataset label
-        label_options = sorted(df_view["Label"].astype(str).unique().tolist()) if "Label" in df_view.columns else []
+        # Only labels actually present in this test split
+        label_options = (
+            df_view["Label"].cat.categories[np.unique(df_view["Label"].cat.codes)].tolist()
+            if "Label" in df_view.columns else []
+        )
         label_filter = st.multiselect("Filter by original Label", label_options, default=label_options)
-        if label_options:
-            df_view = df_view[df_view["Label"].astype(str).isin(label_filter)] if label_filter else df_view
+        if label_options and len(label_filter) < len(label_options):
+            df_view = filter_view(df_view, label_filter)
 
         c4, c5 = st.columns([2,1])
         with c4:
             st.write(f"Showing **{len(df_view):,}** rows")
-            st.dataframe(df_view.head(2000), use_container_width=True, height=400)
+            # Send only one page of rows to the browser per rerun
+            n_pages = (len(df_view) + TABLE_PAGE_SIZE - 1) // TABLE_PAGE_SIZE
+            page = st.number_input("Page", min_value=0, max_value=max(n_pages - 1, 0), value=0, step=1)
+            st.dataframe(df_view.iloc[page * TABLE_PAGE_SIZE:(page + 1) * TABLE_PAGE_SIZE],
+                         width="stretch", height=400)
             
             # Download filtered predictions
-            csv = df_view.to_csv(index=False).encode("utf-8")
+            # Encode only when the user actually clicks download
+            csv = functools.partial(to_csv_bytes, data_hash, model_key, tuple(label_filter), df_view)
             st.download_button("📥 Download Predictions CSV", csv, file_name=f"{mode}_predictions.csv", mime="text/csv")
 
         with c5:
             st.subheader("Attack vs Benign — Predicted")
             if "y_pred" in df_view.columns:
-                pie = px.pie(df_view, names=df_view["y_pred"].map({0:"Benign", 1:"Attack"}), title="Predicted class breakdown")
-                st.plotly_chart(pie, use_container_width=True)
+                # Aggregate to 2 counts first instead of mapping every row to a string
+                counts = np.bincount(df_view["y_pred"].to_numpy(np.int8), minlength=2)
+                pie = px.pie(values=counts, names=["Benign", "Attack"], title="Predicted class breakdown")
+                st.plotly_chart(pie, width="stretch")
 
     elif mode == "Comparison Mode":          # Comparison mode
         st.subheader("📊 Side-by-side Comparison")
@@ -268,17 +494,17 @@ if uploaded_file:
         c1, c2 = st.columns(2)
         with c1:
             st.subheader("IsolationForest ROC")
-            st.pyplot(results["iso"]["roc"])
+            st.image(results["iso"]["roc"], width="stretch")
         with c2:
             st.subheader("RandomForest ROC")
-            st.pyplot(results["rf"]["roc"])
+            st.image(results["rf"]["roc"], width="stretch")
         # Side-by-side confusion matrices
         c3, c4 = st.columns(2)
         with c3:
             st.subheader("IsolationForest Confusion Matrix")
-            st.pyplot(results["iso"]["cm"])
+            st.image(results["iso"]["cm"], width="stretch")
         with c4:
             st.subheader("RandomForest Confusion Matrix")
-            st.pyplot(results["rf"]["cm"])
+            st.image(results["rf"]["cm"], width="stretch")
 else:
     st.info("👆 Please upload a CICIDS2017 CSV file to start.")